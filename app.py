@@ -5,9 +5,6 @@ from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
-
 class Base(DeclarativeBase):
     pass
 
@@ -17,6 +14,10 @@ def create_app():
     # Create the app
     app = Flask(__name__)
     
+    # Configure logging (queue-backed, structured)
+    from logging_config import configure_logging
+    configure_logging(app)
+    
     # Configure app
     app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-change-in-production")
     app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
@@ -33,6 +34,11 @@ def create_app():
     app.config['MAX_CONTENT_LENGTH'] = 8 * 1024 * 1024  # 8MB max file size
     app.config['UPLOAD_FOLDER'] = 'uploads'
     app.config['ADMIN_PATH_SLUG'] = os.environ.get("ADMIN_PATH_SLUG", "hummingbird-42")
+    app.config['INVENTORY_CHECKPOINT_INTERVAL'] = int(os.environ.get("INVENTORY_CHECKPOINT_INTERVAL", "100"))
+    app.config['STATIC_SNAPSHOT_ENABLED'] = os.environ.get("STATIC_SNAPSHOT_ENABLED", "1") == "1"
+    app.config['SERVE_STATIC_SNAPSHOT'] = os.environ.get("SERVE_STATIC_SNAPSHOT", "0") == "1"
+    app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get("COMPRESS_MIN_SIZE", "500"))
+    app.config['COMPRESS_LEVEL'] = int(os.environ.get("COMPRESS_LEVEL", "6"))
     
     # Initialize extensions
     db.init_app(app)
@@ -73,7 +79,17 @@ def create_app():
             )
             db.session.add(admin_user)
             db.session.commit()
-            logging.info(f"Created admin user: {admin_username}")
+            logging.info("Created admin user: %s", admin_username)
+        
+        # Single-row catalog version, bumped by admin mutations
+        from catalog import ensure_catalog_state
+        ensure_catalog_state()
+        
+        # Start the stock ledger from current quantities on first run
+        from inventory import seed_opening_balances
+        seeded = seed_opening_balances()
+        if seeded:
+            logging.info("Seeded stock ledger with %d opening balances", seeded)
     
     # Register blueprints
     from routes.public import public_bp
@@ -86,6 +102,26 @@ def create_app():
     app.register_blueprint(auth_bp, url_prefix='/admin')
     app.register_blueprint(reports_bp, url_prefix=f'/admin/{app.config["ADMIN_PATH_SLUG"]}/reports')
     
+    # Opt-in request profiler for admins
+    from profiler import init_profiler
+    init_profiler(app)
+    
+    # Fingerprinted, precompressed static files and compressed responses
+    from assets import init_assets
+    from compression import init_compression
+    init_assets(app)
+    init_compression(app)
+    
+    # Bring the static snapshot up to date with the catalog and static assets
+    if app.config['STATIC_SNAPSHOT_ENABLED']:
+        from catalog import current_catalog_version
+        from snapshot import read_manifest, snapshot_is_current, publish_if_enabled
+        
+        with app.app_context():
+            catalog_version = current_catalog_version()
+            if not snapshot_is_current(read_manifest(), catalog_version):
+                publish_if_enabled(catalog_version)
+    
     return app
 
 # Create the app instance
@@ -0,0 +1,115 @@
+import os
+import re
+import json
+import hashlib
+import mimetypes
+from flask import send_file
+from compression import COMPRESS_MIMETYPES, ENCODING_SUFFIXES, available_encodings, compress_bytes, negotiate_encoding
+
+# Fingerprinted URLs never change content, so browsers may keep them for a year
+ONE_YEAR = 365 * 24 * 60 * 60
+
+_FINGERPRINT_RE = re.compile(r'^(?P<base>.+)\.[0-9a-f]{12}(?P<ext>\.[^./]+)$')
+
+def _write_atomic(path, data):
+    # Dot-prefixed so another worker's prune pass never removes it mid-write
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, f'.{name}.tmp-{os.getpid()}')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def build_asset_manifest(static_folder, cache_dir, min_size=500):
+    """
+    Hash every static file and precompress the text ones.
+    Returns (urls, files): logical name -> fingerprinted name, and
+    fingerprinted name -> (source path, mimetype, {encoding: precompressed path}).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    urls = {}
+    files = {}
+    keep = set()
+
+    for dirpath, _, filenames in os.walk(static_folder):
+        for filename in filenames:
+            source = os.path.join(dirpath, filename)
+            logical = os.path.relpath(source, static_folder).replace(os.sep, '/')
+
+            with open(source, 'rb') as f:
+                data = f.read()
+
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            base, ext = os.path.splitext(logical)
+            fingerprinted = f'{base}.{digest}{ext}'
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+            variants = {}
+            if mimetype in COMPRESS_MIMETYPES and len(data) >= min_size:
+                for encoding in available_encodings():
+                    cached_name = fingerprinted.replace('/', '__') + ENCODING_SUFFIXES[encoding]
+                    cached_path = os.path.join(cache_dir, cached_name)
+                    if not os.path.exists(cached_path):
+                        _write_atomic(cached_path, compress_bytes(data, encoding, level=11 if encoding == 'br' else 9))
+                    variants[encoding] = cached_path
+                    keep.add(cached_name)
+
+            urls[logical] = fingerprinted
+            files[fingerprinted] = (source, mimetype, variants)
+
+    # Drop precompressed copies of assets that have since changed
+    for name in os.listdir(cache_dir):
+        if name not in keep and not name.startswith('.'):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+    return urls, files
+
+def init_assets(app):
+    """Serve static files under content-hash URLs with immutable caching"""
+    urls, files = build_asset_manifest(
+        app.static_folder,
+        os.path.join(app.instance_path, 'static-cache'),
+        min_size=app.config.get('COMPRESS_MIN_SIZE', 500)
+    )
+    app.extensions['assets'] = {
+        'urls': urls,
+        'files': files,
+        # Changes whenever any fingerprinted URL does; pages embedding them must be re-rendered
+        'hash': hashlib.sha256(json.dumps(urls, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    }
+    send_static_file = app.send_static_file
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in urls:
+            values['filename'] = urls[values['filename']]
+
+    def serve_static(filename):
+        entry = files.get(filename)
+        if entry is None:
+            # Pages rendered before a deploy may still reference an older
+            # fingerprint; serve the current file without long-lived caching
+            match = _FINGERPRINT_RE.match(filename)
+            if match and match.group('base') + match.group('ext') in urls:
+                filename = match.group('base') + match.group('ext')
+            return send_static_file(filename)
+
+        source, mimetype, variants = entry
+        encoding = negotiate_encoding() if variants else None
+
+        if encoding in variants:
+            response = send_file(variants[encoding], mimetype=mimetype, max_age=ONE_YEAR)
+            response.headers['Content-Encoding'] = encoding
+        else:
+            response = send_file(source, mimetype=mimetype, max_age=ONE_YEAR)
+
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        if variants:
+            response.vary.add('Accept-Encoding')
+        return response
+
+    app.view_functions['static'] = serve_static
+    return urls
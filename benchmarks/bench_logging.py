@@ -0,0 +1,99 @@
+"""
+Per-request logging overhead, before and after the queue-backed setup.
+
+Replays the log calls a typical admin page makes (werkzeug access line,
+SQLAlchemy statement/parameter and pool records, one app debug line) inside
+a request context and times them on the calling thread. Output goes to a
+temporary file standing in for stderr.
+
+Usage: python benchmarks/bench_logging.py [requests]
+"""
+import os
+import sys
+import time
+import logging
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from logging_config import configure_logging, _stop_listener
+
+STATEMENTS = 4
+
+def simulate_request(i):
+    """Log calls made while serving one request under the old DEBUG root"""
+    engine = logging.getLogger('sqlalchemy.engine.Engine')
+    pool = logging.getLogger('sqlalchemy.pool.impl.QueuePool')
+    app_logger = logging.getLogger('app')
+    access = logging.getLogger('werkzeug')
+
+    pool.debug('Connection %r checked out from pool', i)
+    engine.info('BEGIN (implicit)')
+    for n in range(STATEMENTS):
+        engine.info('SELECT products.id, products.name FROM products WHERE products.id = ?')
+        engine.info('[cached since %.4gs ago] (%d,)', 0.01 * n, i)
+    engine.info('COMMIT')
+    pool.debug('Connection %r being returned to pool', i)
+    app_logger.debug('Rendered %s for request %d', 'admin/products.html', i)
+    access.info('127.0.0.1 - - "GET /admin/products HTTP/1.1" 200 -')
+
+def reset_logging():
+    _stop_listener()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for name in list(logging.root.manager.loggerDict):
+        logging.getLogger(name).setLevel(logging.NOTSET)
+
+def run(app, requests):
+    with app.test_request_context('/admin/products'):
+        app.preprocess_request()
+        start = time.perf_counter()
+        for i in range(requests):
+            simulate_request(i)
+        elapsed = time.perf_counter() - start
+    return elapsed / requests * 1e6
+
+def scenario(label, requests, setup):
+    reset_logging()
+    with tempfile.TemporaryFile('w') as sink:
+        real_stderr = sys.stderr
+        sys.stderr = sink
+        try:
+            app = Flask('bench')
+            setup(app, sink)
+            per_request = run(app, requests)
+            drain_start = time.perf_counter()
+            _stop_listener()
+            drain = time.perf_counter() - drain_start
+        finally:
+            sys.stderr = real_stderr
+    reset_logging()
+    print(f'{label:<44} {per_request:8.1f} us/request   (listener drain {drain * 1000:.0f} ms)')
+
+def before(app, sink):
+    logging.basicConfig(level=logging.DEBUG, stream=sink, force=True)
+
+def after_defaults(app, sink):
+    os.environ.pop('LOG_LEVELS', None)
+    configure_logging(app)
+
+def after_same_volume(app, sink):
+    os.environ['LOG_LEVELS'] = 'sqlalchemy.engine=INFO,sqlalchemy.pool=DEBUG'
+    os.environ['LOG_LEVEL'] = 'DEBUG'
+    try:
+        configure_logging(app)
+    finally:
+        os.environ.pop('LOG_LEVELS', None)
+        os.environ.pop('LOG_LEVEL', None)
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    print(f'{requests} simulated requests, {STATEMENTS} SQL statements each\n')
+    scenario('before: basicConfig(DEBUG), sync stderr', requests, before)
+    scenario('after: queue + JSON, default levels', requests, after_defaults)
+    scenario('after: queue + JSON, all records kept', requests, after_same_volume)
+
+if __name__ == '__main__':
+    main()
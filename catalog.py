@@ -0,0 +1,31 @@
+from sqlalchemy.exc import IntegrityError
+from models import CatalogState
+from app import db
+
+def ensure_catalog_state():
+    """
+    Create the single catalog_state row at startup.
+    Workers starting together may race; the primary key lets only one insert win.
+    """
+    if db.session.get(CatalogState, 1) is not None:
+        return
+
+    db.session.add(CatalogState(id=1, version=0))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker created it first
+        db.session.rollback()
+
+def current_catalog_version():
+    """Current public catalog version (0 before the first mutation)"""
+    version = db.session.query(CatalogState.version).filter_by(id=1).scalar()
+    return version or 0
+
+def bump_catalog_version():
+    """Increment the catalog version in the current session; caller commits"""
+    CatalogState.query.filter_by(id=1).update(
+        {CatalogState.version: CatalogState.version + 1},
+        synchronize_session=False
+    )
+    return current_catalog_version()
@@ -0,0 +1,108 @@
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Only text-like responses are worth compressing
+COMPRESS_MIMETYPES = {
+    'text/html',
+    'text/css',
+    'text/csv',
+    'text/plain',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
+    'image/svg+xml',
+}
+
+# File suffixes for precompressed copies
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+def available_encodings():
+    """Encodings we can produce, most preferred first"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def negotiate_encoding():
+    """Best encoding the client accepts, or None"""
+    return request.accept_encodings.best_match(available_encodings())
+
+class _Compressor:
+    """Incremental compressor with the same API for gzip and brotli"""
+
+    def __init__(self, encoding, level):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=min(level, 11))
+        else:
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        if self.encoding == 'br':
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def flush(self):
+        """Emit everything buffered so far without ending the stream"""
+        if self.encoding == 'br':
+            return self._brotli.flush()
+        return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+def compress_bytes(data, encoding, level=6):
+    """One-shot compression"""
+    compressor = _Compressor(encoding, level)
+    return compressor.compress(data) + compressor.finish()
+
+def _compress_stream(chunks, encoding, level):
+    """Compress a streamed body chunk by chunk, flushing so clients see rows promptly"""
+    compressor = _Compressor(encoding, level)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        if chunk:
+            yield compressor.compress(chunk) + compressor.flush()
+    yield compressor.finish()
+
+def init_compression(app):
+    """Compress eligible responses according to Accept-Encoding"""
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough
+                or response.status_code < 200
+                or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESS_MIMETYPES):
+            return response
+
+        encoding = negotiate_encoding()
+        response.vary.add('Accept-Encoding')
+        if encoding is None:
+            return response
+
+        level = app.config['COMPRESS_LEVEL']
+
+        if response.is_streamed:
+            response.response = _compress_stream(response.response, encoding, level)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < app.config['COMPRESS_MIN_SIZE']:
+                return response
+            response.set_data(compress_bytes(data, encoding, level))
+
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # A strong ETag names the uncompressed bytes
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from app import db
+from models import Product, StockMovement, InventoryCheckpoint, LedgerState
+
+def record_movement(product, kind, quantity_delta, sale=None):
+    """
+    Append a stock movement for product to the current session.
+    Caller commits; a checkpoint is written when enough movements have piled up.
+    """
+    # Hold the ledger lock until commit so movement ids follow commit order
+    db.session.query(LedgerState).filter_by(id=1).with_for_update().one_or_none()
+
+    movement = StockMovement(
+        product_id=product.id,
+        kind=kind,
+        quantity_delta=quantity_delta,
+        bp=product.bp,
+        sp=product.sp,
+        sale_id=sale.id if sale is not None else None,
+        created_at=datetime.utcnow()
+    )
+    db.session.add(movement)
+    db.session.flush()
+
+    maybe_checkpoint(movement)
+    return movement
+
+def _latest_checkpoint(before=None):
+    """Most recent checkpoint, optionally only those taken at or before a moment"""
+    query = InventoryCheckpoint.query
+    if before is not None:
+        query = query.filter(InventoryCheckpoint.taken_at <= before)
+    return query.order_by(InventoryCheckpoint.last_movement_id.desc()).first()
+
+def _sum_movements(after_id, until=None, upto_id=None):
+    """Sum units and valuation of movements newer than after_id"""
+    query = db.session.query(
+        func.coalesce(func.sum(StockMovement.quantity_delta), 0),
+        func.coalesce(func.sum(StockMovement.quantity_delta * StockMovement.bp), 0),
+        func.coalesce(func.sum(StockMovement.quantity_delta * StockMovement.sp), 0)
+    ).filter(StockMovement.id > after_id)
+
+    if until is not None:
+        query = query.filter(StockMovement.created_at <= until)
+    if upto_id is not None:
+        query = query.filter(StockMovement.id <= upto_id)
+
+    units, value_bp, value_sp = query.one()
+    return int(units), Decimal(str(value_bp)), Decimal(str(value_sp))
+
+def maybe_checkpoint(movement):
+    """Write a checkpoint once INVENTORY_CHECKPOINT_INTERVAL movements follow the last one"""
+    interval = current_app.config.get('INVENTORY_CHECKPOINT_INTERVAL', 100)
+    last = _latest_checkpoint()
+    last_id = last.last_movement_id if last else 0
+
+    if movement.id - last_id < interval:
+        return None
+
+    units, value_bp, value_sp = _sum_movements(last_id, upto_id=movement.id)
+    checkpoint = InventoryCheckpoint(
+        last_movement_id=movement.id,
+        taken_at=movement.created_at,
+        total_units=(last.total_units if last else 0) + units,
+        total_value_bp=(last.total_value_bp if last else Decimal('0')) + value_bp,
+        total_value_sp=(last.total_value_sp if last else Decimal('0')) + value_sp
+    )
+    db.session.add(checkpoint)
+    return checkpoint
+
+def stock_at(when):
+    """
+    Total stock and valuation as of a moment.
+    Returns dict with units, value_bp and value_sp, computed from the nearest
+    checkpoint plus the movements recorded after it.
+    """
+    checkpoint = _latest_checkpoint(before=when)
+
+    if checkpoint:
+        units, value_bp, value_sp = _sum_movements(checkpoint.last_movement_id, until=when)
+        units += checkpoint.total_units
+        value_bp += checkpoint.total_value_bp
+        value_sp += checkpoint.total_value_sp
+    else:
+        units, value_bp, value_sp = _sum_movements(0, until=when)
+
+    return {'units': units, 'value_bp': value_bp, 'value_sp': value_sp}
+
+def inventory_value_series(days=30):
+    """
+    End-of-day inventory valuation for the last `days` days, oldest first.
+    One stock_at lookup for the opening balance plus one grouped scan.
+    """
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = today - timedelta(days=days - 1)
+    opening = stock_at(start - timedelta(microseconds=1))
+
+    day = func.date(StockMovement.created_at)
+    rows = db.session.query(
+        day,
+        func.sum(StockMovement.quantity_delta),
+        func.sum(StockMovement.quantity_delta * StockMovement.bp),
+        func.sum(StockMovement.quantity_delta * StockMovement.sp)
+    ).filter(
+        StockMovement.created_at >= start
+    ).group_by(day).all()
+    deltas = {str(row[0]): row[1:] for row in rows}
+
+    units = opening['units']
+    value_bp = float(opening['value_bp'])
+    value_sp = float(opening['value_sp'])
+
+    series = []
+    for offset in range(days):
+        date_key = (start + timedelta(days=offset)).strftime('%Y-%m-%d')
+        if date_key in deltas:
+            d_units, d_bp, d_sp = deltas[date_key]
+            units += int(d_units or 0)
+            value_bp += float(d_bp or 0)
+            value_sp += float(d_sp or 0)
+        series.append({
+            'date': date_key,
+            'units': units,
+            'value_bp': value_bp,
+            'value_sp': value_sp
+        })
+
+    return series
+
+def seed_opening_balances():
+    """
+    Record an opening movement per product the first time the app starts.
+    The LedgerState marker is inserted in the same transaction, so when several
+    workers start at once only one of them can seed.
+    """
+    if db.session.get(LedgerState, 1) is not None:
+        return 0
+
+    # Ledgers started before the marker existed already have their openings
+    products = []
+    if StockMovement.query.first() is None:
+        products = Product.query.filter(Product.quantity > 0).all()
+
+    db.session.add(LedgerState(id=1))
+    if products:
+        now = datetime.utcnow()
+        for product in products:
+            db.session.add(StockMovement(
+                product_id=product.id,
+                kind='opening',
+                quantity_delta=product.quantity,
+                bp=product.bp,
+                sp=product.sp,
+                created_at=now
+            ))
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker seeded first
+        db.session.rollback()
+        return 0
+    return len(products)
@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import uuid
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime, timezone
+from flask import g, request, has_request_context
+
+# Chatty third-party loggers are quiet unless LOG_LEVELS says otherwise
+DEFAULT_LOGGER_LEVELS = {
+    'sqlalchemy.engine': 'WARNING',
+    'sqlalchemy.pool': 'WARNING',
+}
+
+_listener = None
+
+def _parse_pairs(value):
+    """Parse "name=value,name2=value2" into a dict"""
+    pairs = {}
+    for item in (value or '').split(','):
+        if '=' in item:
+            name, _, setting = item.partition('=')
+            if name.strip() and setting.strip():
+                pairs[name.strip()] = setting.strip()
+    return pairs
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the current request id (runs on the request thread)"""
+
+    def filter(self, record):
+        request_id = None
+        if has_request_context():
+            request_id = getattr(g, 'request_id', None)
+        record.request_id = request_id or '-'
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Keep one in every N records below WARNING for the configured loggers"""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+        self.counters = {name: 0 for name in rates}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+
+        for name, rate in self.rates.items():
+            if record.name == name or record.name.startswith(name + '.'):
+                self.counters[name] += 1
+                return (self.counters[name] - 1) % rate == 0
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that only merges args and renders tracebacks on the calling
+    thread; all formatting and I/O happen on the listener thread.
+    """
+
+    def prepare(self, record):
+        # Records only reach this one handler, so they are updated in place
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def configure_logging(app):
+    """
+    Route all logging through a queue drained by a background listener.
+    Reads LOG_LEVEL, LOG_LEVELS ("logger=LEVEL,..."), LOG_FORMAT (json|text)
+    and LOG_SAMPLING ("logger=N,..." keeps 1 in N records below WARNING).
+    """
+    global _listener
+
+    level = os.environ.get('LOG_LEVEL', 'INFO').upper()
+    logger_levels = dict(DEFAULT_LOGGER_LEVELS)
+    logger_levels.update(_parse_pairs(os.environ.get('LOG_LEVELS')))
+    sampling = {
+        name: max(int(rate), 1)
+        for name, rate in _parse_pairs(os.environ.get('LOG_SAMPLING')).items()
+        if rate.isdigit()
+    }
+    log_format = os.environ.get('LOG_FORMAT', 'json').lower()
+
+    app.config['LOG_LEVEL'] = level
+    app.config['LOG_LEVELS'] = logger_levels
+    app.config['LOG_SAMPLING'] = sampling
+
+    # Output side: formatting and stderr writes on the listener thread
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if log_format == 'text':
+        stream_handler.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s'
+        ))
+    else:
+        stream_handler.setFormatter(JsonFormatter())
+
+    # Input side: cheap enqueue on the request thread
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    if sampling:
+        queue_handler.addFilter(SamplingFilter(sampling))
+    queue_handler.addFilter(RequestContextFilter())
+
+    _stop_listener()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    for name, logger_level in logger_levels.items():
+        logging.getLogger(name).setLevel(logger_level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_stop_listener)
+
+    # Request ids: honour an upstream X-Request-ID, otherwise mint one
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request.headers.get('X-Request-ID', '')[:64] or uuid.uuid4().hex
+
+    @app.after_request
+    def expose_request_id(response):
+        request_id = getattr(g, 'request_id', None)
+        if request_id:
+            response.headers['X-Request-ID'] = request_id
+        return response
+
+    return _listener
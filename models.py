@@ -79,3 +79,58 @@ class AdminUser(db.Model):
     
     def __repr__(self):
         return f'<AdminUser {self.username}>'
+
+class StockMovement(db.Model):
+    # Checkpoints and delta scans rely on ids being assigned in commit order.
+    # SQLite serializes writers; elsewhere record_movement() holds a row lock
+    # on LedgerState from before the insert until commit to guarantee it.
+    __tablename__ = 'stock_movements'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # No foreign key: the ledger is append-only and must outlive deleted products
+    product_id = db.Column(db.Integer, nullable=False, index=True)
+    kind = db.Column(db.String(20), nullable=False)  # opening, upload, restock, sale, delete
+    quantity_delta = db.Column(db.Integer, nullable=False)
+    bp = db.Column(db.Numeric(10, 2), nullable=False)  # buying price per unit at movement
+    sp = db.Column(db.Numeric(10, 2), nullable=False)  # selling price per unit at movement
+    sale_id = db.Column(db.Integer, db.ForeignKey('sales.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<StockMovement {self.kind} product={self.product_id} {self.quantity_delta:+d}>'
+
+class LedgerState(db.Model):
+    __tablename__ = 'ledger_state'
+    
+    # Single row (id=1): its presence marks the opening balances as seeded,
+    # and it is locked FOR UPDATE to serialize stock movement writes
+    id = db.Column(db.Integer, primary_key=True)
+    seeded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<LedgerState seeded {self.seeded_at}>'
+
+class InventoryCheckpoint(db.Model):
+    __tablename__ = 'inventory_checkpoints'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # Running totals over every movement up to and including last_movement_id
+    last_movement_id = db.Column(db.Integer, nullable=False, unique=True)
+    taken_at = db.Column(db.DateTime, nullable=False, index=True)  # created_at of that movement
+    total_units = db.Column(db.Integer, nullable=False)
+    total_value_bp = db.Column(db.Numeric(14, 2), nullable=False)
+    total_value_sp = db.Column(db.Numeric(14, 2), nullable=False)
+    
+    def __repr__(self):
+        return f'<InventoryCheckpoint #{self.last_movement_id} units={self.total_units}>'
+
+class CatalogState(db.Model):
+    __tablename__ = 'catalog_state'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # Bumped by every admin mutation that can change what the public site shows
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<CatalogState v{self.version}>'
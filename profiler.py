@@ -0,0 +1,206 @@
+import os
+import io
+import re
+import json
+import time
+import pstats
+import cProfile
+import threading
+from datetime import datetime
+from flask import g, request, session, current_app, before_render_template, template_rendered
+from sqlalchemy import event
+from app import db
+
+# Keep this many profiles on disk; older ones are pruned
+MAX_PROFILES = 50
+
+_hooks_lock = threading.Lock()
+_active_profiles = 0
+
+def profiles_dir():
+    """Directory holding saved profiles"""
+    return os.path.join(current_app.instance_path, 'profiles')
+
+def _profile_requested():
+    """Admins opt in per request with ?_profile=1 or an X-Profile: 1 header"""
+    if request.args.get('_profile') != '1' and request.headers.get('X-Profile') != '1':
+        return False
+    return bool(session.get('admin_logged_in'))
+
+def _current_profile():
+    return getattr(g, '_profile', None)
+
+# SQL and template hooks: installed only while at least one request is profiled
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile()
+    if profile is not None:
+        conn.info.setdefault('_profile_query_start', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile()
+    starts = conn.info.get('_profile_query_start')
+    if profile is not None and starts:
+        profile['sql'].append({
+            'statement': statement,
+            'parameters': repr(parameters)[:500],
+            'ms': round((time.perf_counter() - starts.pop()) * 1000, 3)
+        })
+
+def _before_render(sender, template, context, **extra):
+    profile = _current_profile()
+    if profile is not None:
+        profile['render_starts'].append(time.perf_counter())
+
+def _after_render(sender, template, context, **extra):
+    profile = _current_profile()
+    if profile is not None and profile['render_starts']:
+        profile['templates'].append({
+            'name': template.name,
+            'ms': round((time.perf_counter() - profile['render_starts'].pop()) * 1000, 3)
+        })
+
+def _install_hooks(engine):
+    global _active_profiles
+    with _hooks_lock:
+        if _active_profiles == 0:
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+            before_render_template.connect(_before_render)
+            template_rendered.connect(_after_render)
+        _active_profiles += 1
+
+def _remove_hooks(engine):
+    global _active_profiles
+    with _hooks_lock:
+        _active_profiles -= 1
+        if _active_profiles == 0:
+            event.remove(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.remove(engine, 'after_cursor_execute', _after_cursor_execute)
+            before_render_template.disconnect(_before_render)
+            template_rendered.disconnect(_after_render)
+
+def _start_profile():
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler already owns this thread
+        current_app.logger.warning("Request profiling skipped: profiler already active")
+        return
+
+    g._profile = {
+        # Nested request contexts (e.g. the snapshot publisher) share g;
+        # only the request that started the profile may discard it
+        'owner': request._get_current_object(),
+        'profiler': profiler,
+        'started': time.perf_counter(),
+        'sql': [],
+        'templates': [],
+        'render_starts': []
+    }
+    _install_hooks(db.engine)
+
+def _finish_profile(response=None):
+    """Stop profiling and write the .prof dump plus a JSON summary"""
+    profile = g.pop('_profile', None)
+    if profile is None:
+        return None
+
+    profile['profiler'].disable()
+    duration_ms = (time.perf_counter() - profile['started']) * 1000
+    _remove_hooks(db.engine)
+
+    directory = profiles_dir()
+    os.makedirs(directory, exist_ok=True)
+    request_tag = re.sub(r'[^A-Za-z0-9]', '', getattr(g, 'request_id', '') or '')[:12] or 'req'
+    profile_id = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{request_tag}"
+
+    profile['profiler'].dump_stats(os.path.join(directory, f'{profile_id}.prof'))
+
+    stats_text = io.StringIO()
+    stats = pstats.Stats(profile['profiler'], stream=stats_text)
+    stats.sort_stats('cumulative').print_stats(40)
+    stats.print_callees(15)
+
+    summary = {
+        'id': profile_id,
+        'method': request.method,
+        'path': request.full_path.rstrip('?'),
+        'endpoint': request.endpoint,
+        'status': response.status_code if response is not None else None,
+        'created_at': datetime.utcnow().isoformat(),
+        'duration_ms': round(duration_ms, 3),
+        'sql_count': len(profile['sql']),
+        'sql_ms': round(sum(q['ms'] for q in profile['sql']), 3),
+        'template_ms': round(sum(t['ms'] for t in profile['templates']), 3),
+        'sql': profile['sql'],
+        'templates': profile['templates'],
+        'call_tree': stats_text.getvalue()
+    }
+    with open(os.path.join(directory, f'{profile_id}.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    _prune_profiles(directory)
+    return profile_id
+
+def _prune_profiles(directory):
+    summaries = sorted(name for name in os.listdir(directory) if name.endswith('.json'))
+    for name in summaries[:-MAX_PROFILES]:
+        base = name[:-len('.json')]
+        for ext in ('.json', '.prof'):
+            try:
+                os.remove(os.path.join(directory, base + ext))
+            except OSError:
+                pass
+
+def list_profiles(limit=MAX_PROFILES):
+    """Summaries of recent profiles, newest first (without the bulky details)"""
+    directory = profiles_dir()
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                summary = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for key in ('sql', 'templates', 'call_tree'):
+            summary.pop(key, None)
+        profiles.append(summary)
+        if len(profiles) >= limit:
+            break
+    return profiles
+
+def init_profiler(app):
+    """Register the opt-in request profiler; unprofiled requests pay one arg/header check"""
+
+    @app.before_request
+    def start_request_profile():
+        if _profile_requested():
+            _start_profile()
+
+    @app.after_request
+    def finish_request_profile(response):
+        if _current_profile() is not None:
+            try:
+                profile_id = _finish_profile(response)
+                if profile_id:
+                    response.headers['X-Profile-Id'] = profile_id
+            except Exception as e:
+                current_app.logger.error("Error saving request profile: %s", e)
+        return response
+
+    @app.teardown_request
+    def discard_request_profile(exc):
+        # Requests that raised never reach after_request
+        profile = _current_profile()
+        if profile is None or profile['owner'] is not request._get_current_object():
+            return
+        g.pop('_profile', None)
+        profile['profiler'].disable()
+        _remove_hooks(db.engine)
@@ -0,0 +1,208 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from app import db
+from models import Sale
+
+# Cached reports per worker; custom ranges make the key space open-ended
+MAX_CACHED_REPORTS = 128
+
+def resolve_period(period, from_date=None, to_date=None, now=None):
+    """
+    Turn report query args into a date range.
+    Ranges are day-aligned and end-exclusive; `end` is None for periods that
+    run up to now, and `closed` is True once the range lies entirely in the past.
+    """
+    now = now or datetime.utcnow()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    end = None
+
+    if period == 'month':
+        start = today.replace(day=1)
+        title = "This Month"
+    elif period == 'last_month':
+        end = today.replace(day=1)
+        start = (end - timedelta(days=1)).replace(day=1)
+        title = "Last Month"
+    elif period == 'year':
+        start = today.replace(month=1, day=1)
+        title = "This Year"
+    elif period == 'custom' and from_date and to_date:
+        try:
+            start = datetime.strptime(from_date, '%Y-%m-%d')
+            end = datetime.strptime(to_date, '%Y-%m-%d') + timedelta(days=1)  # to_date is inclusive
+            title = f"{from_date} to {to_date}"
+        except ValueError:
+            period = 'week'
+    else:
+        period = 'week'
+
+    if period == 'week':
+        start = today - timedelta(days=6)
+        end = None
+        title = "This Week"
+
+    return {
+        'period': period,
+        'title': title,
+        'start': start,
+        'end': end,
+        'closed': end is not None and end <= now
+    }
+
+def _sales_in_range(query, start, end):
+    query = query.filter(Sale.sold_at >= start)
+    if end is not None:
+        query = query.filter(Sale.sold_at < end)
+    return query
+
+def compute_report(start, end):
+    """Sales rows, totals and daily chart data for a range (plain data, safe to cache)"""
+    sales = _sales_in_range(
+        Sale.query.options(joinedload(Sale.product)), start, end
+    ).order_by(Sale.sold_at.desc()).all()
+
+    rows = []
+    daily_sales = {}
+    total_revenue = Decimal('0')
+    total_cogs = Decimal('0')
+    total_units = 0
+
+    for sale in sales:
+        rows.append({
+            'sold_at': sale.sold_at,
+            'quantity': sale.quantity,
+            'bp_at_sale': sale.bp_at_sale,
+            'sp_at_sale': sale.sp_at_sale,
+            'profit': sale.profit,
+            'product': {
+                'name': sale.product.name,
+                'brand': sale.product.brand,
+                'category': sale.product.category
+            }
+        })
+
+        revenue = sale.sp_at_sale * sale.quantity
+        total_revenue += revenue
+        total_cogs += sale.bp_at_sale * sale.quantity
+        total_units += sale.quantity
+
+        # Group sales by date for chart data
+        date_key = sale.sold_at.strftime('%Y-%m-%d')
+        if date_key not in daily_sales:
+            daily_sales[date_key] = {'revenue': 0, 'profit': 0}
+        daily_sales[date_key]['revenue'] += float(revenue)
+        daily_sales[date_key]['profit'] += float(sale.profit)
+
+    return {
+        'sales': rows,
+        'total_revenue': total_revenue,
+        'total_cogs': total_cogs,
+        'total_profit': total_revenue - total_cogs,
+        'total_units': total_units,
+        'daily_sales': daily_sales
+    }
+
+class ReportCache:
+    """
+    LRU of computed reports keyed by (start, end).
+    Closed periods never change. Open ones are dropped when a sale lands in
+    them: directly via invalidate_for_sale() in this worker, and via a
+    sales-id watermark check for sales recorded by other workers.
+    """
+
+    def __init__(self, max_entries=MAX_CACHED_REPORTS):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _latest_sale_id(self):
+        return db.session.query(func.max(Sale.id)).scalar() or 0
+
+    def _still_current(self, key, entry):
+        """True if no sale newer than the entry's watermark falls in its range"""
+        if entry['closed']:
+            return True
+
+        latest = self._latest_sale_id()
+        if latest == entry['max_sale_id']:
+            return True
+
+        start, end = key
+        newer = _sales_in_range(
+            db.session.query(Sale.id).filter(Sale.id > entry['max_sale_id']), start, end
+        ).first()
+        if newer is None:
+            entry['max_sale_id'] = latest
+            return True
+        return False
+
+    def get(self, period):
+        """Cached report for a resolved period, computing it on a miss"""
+        key = (period['start'], period['end'])
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is not None:
+            if self._still_current(key, entry):
+                with self._lock:
+                    self.hits += 1
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                return entry['report']
+
+            with self._lock:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+        max_sale_id = self._latest_sale_id()
+        report = compute_report(period['start'], period['end'])
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = {
+                'report': report,
+                'closed': period['closed'],
+                'max_sale_id': max_sale_id
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return report
+
+    def invalidate_for_sale(self, sale):
+        """Drop cached open reports whose range covers a newly recorded sale"""
+        sold_at = sale.sold_at
+        with self._lock:
+            for (start, end), entry in list(self._entries.items()):
+                if entry['closed']:
+                    continue
+                if sold_at >= start and (end is None or sold_at < end):
+                    del self._entries[(start, end)]
+                    self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+# One cache per worker process
+report_cache = ReportCache()
+
+def get_report(period, from_date=None, to_date=None):
+    """Resolve report args and return (period info, report data)"""
+    resolved = resolve_period(period, from_date, to_date)
+    return resolved, report_cache.get(resolved)
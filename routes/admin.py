@@ -1,8 +1,13 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, send_from_directory, abort
 from models import Product, Sale, AdminUser
 from forms import ProductForm, SellForm, RestockForm
 from routes.auth import login_required
 from utils import process_image
+from inventory import record_movement, inventory_value_series
+from catalog import bump_catalog_version
+from snapshot import publish_if_enabled
+from profiler import list_profiles, profiles_dir
+from reporting import report_cache
 from app import db
 from sqlalchemy import func
 from decimal import Decimal
@@ -42,13 +47,17 @@ def dashboard():
     # Recent sales
     recent_sales = Sale.query.order_by(Sale.sold_at.desc()).limit(5).all()
     
+    # Inventory value over time from the stock ledger
+    inventory_series = inventory_value_series(days=30)
+    
     return render_template('admin/dashboard.html',
                          total_stock=total_stock,
                          net_worth_bp=net_worth_bp,
                          net_worth_sp=net_worth_sp,
                          weekly_profit=weekly_profit,
                          monthly_profit=monthly_profit,
-                         recent_sales=recent_sales)
+                         recent_sales=recent_sales,
+                         inventory_series=inventory_series)
 
 @admin_bp.route('/products')
 @login_required
@@ -111,14 +120,18 @@ def upload_product():
             )
             
             db.session.add(product)
+            db.session.flush()
+            record_movement(product, 'upload', product.quantity)
+            catalog_version = bump_catalog_version()
             db.session.commit()
+            publish_if_enabled(catalog_version)
             
             flash(f'Product "{product.name}" uploaded successfully!', 'success')
             return redirect(url_for('admin.products'))
             
         except Exception as e:
             db.session.rollback()
-            current_app.logger.error(f"Error uploading product: {e}")
+            current_app.logger.error("Error uploading product: %s", e)
             flash('Error uploading product. Please try again.', 'error')
     
     return render_template('admin/upload.html', form=form)
@@ -161,13 +174,18 @@ def sell_product(product_id):
         product.quantity -= quantity_to_sell
         
         db.session.add(sale)
+        db.session.flush()
+        record_movement(product, 'sale', -quantity_to_sell, sale=sale)
+        catalog_version = bump_catalog_version()
         db.session.commit()
+        report_cache.invalidate_for_sale(sale)
+        publish_if_enabled(catalog_version)
         
         flash(f'Umeuza {quantity_to_sell} × {product.name}. Profit: KSh {profit:,.2f}', 'success')
         
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f"Error recording sale: {e}")
+        current_app.logger.error("Error recording sale: %s", e)
         flash('Error recording sale. Please try again.', 'error')
     
     return redirect(url_for('admin.products'))
@@ -186,13 +204,16 @@ def restock_product(product_id):
     
     try:
         product.quantity += quantity_to_add
+        record_movement(product, 'restock', quantity_to_add)
+        catalog_version = bump_catalog_version()
         db.session.commit()
+        publish_if_enabled(catalog_version)
         
         flash(f'Added {quantity_to_add} units to {product.name}. New stock: {product.quantity}', 'success')
         
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f"Error restocking: {e}")
+        current_app.logger.error("Error restocking: %s", e)
         flash('Error restocking product. Please try again.', 'error')
     
     return redirect(url_for('admin.products'))
@@ -220,14 +241,32 @@ def delete_product(product_id):
             if os.path.exists(web_path):
                 os.remove(web_path)
         
+        record_movement(product, 'delete', -product.quantity)
         db.session.delete(product)
+        catalog_version = bump_catalog_version()
         db.session.commit()
+        publish_if_enabled(catalog_version)
         
         flash(f'Product "{product.name}" deleted successfully.', 'success')
         
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f"Error deleting product: {e}")
+        current_app.logger.error("Error deleting product: %s", e)
         flash('Error deleting product. Please try again.', 'error')
     
     return redirect(url_for('admin.products'))
+
+@admin_bp.route('/profiles')
+@login_required
+def profiles():
+    """Recent request profiles captured with ?_profile=1"""
+    return render_template('admin/profiles.html', profiles=list_profiles())
+
+@admin_bp.route('/profiles/<profile_id>.<ext>')
+@login_required
+def download_profile(profile_id, ext):
+    """Download a profile as a pstats dump (.prof) or JSON summary (.json)"""
+    if ext not in ('prof', 'json'):
+        abort(404)
+    
+    return send_from_directory(profiles_dir(), f'{profile_id}.{ext}', as_attachment=True)
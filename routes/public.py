@@ -3,15 +3,13 @@ from models import Product
 from sqlalchemy import func
 from app import db
 from flask import Blueprint, render_template, request, jsonify, send_file, current_app
+from snapshot import snapshot_response, gallery_filename, build_catalog
+from search_index import prefix_index
 import os
 public_bp = Blueprint('public', __name__)
 
-@public_bp.route('/')
-def index():
-    """Public gallery with search and filtering"""
-    search_query = request.args.get('q', '').strip()
-    category_filter = request.args.get('category', '').strip()
-    
+def public_products(search_query='', category_filter=''):
+    """In-stock products for the public gallery, one per canonical key"""
     # Base query for deduplication - get one representative per canonical key
     subquery = db.session.query(
         func.min(Product.id).label('min_id')
@@ -45,25 +43,73 @@ def index():
     if category_filter:
         query = query.filter(Product.category == category_filter)
     
-    products = query.order_by(Product.created_at.desc()).all()
-    
-    # Get categories for filter chips
+    return query.order_by(Product.created_at.desc()).all()
+
+def public_categories():
+    """Categories that currently have stock, for filter chips"""
     categories = db.session.query(Product.category).filter(
         Product.quantity > 0
     ).distinct().all()
-    categories = [cat[0] for cat in categories]
-    
+    return [cat[0] for cat in categories]
+
+def render_gallery(search_query='', category_filter=''):
+    """Render the public gallery page"""
     return render_template('public/index.html', 
-                         products=products, 
-                         categories=categories,
+                         products=public_products(search_query, category_filter), 
+                         categories=public_categories(),
                          search_query=search_query,
                          current_category=category_filter)
 
+@public_bp.route('/')
+def index():
+    """Public gallery with search and filtering"""
+    search_query = request.args.get('q', '').strip()
+    category_filter = request.args.get('category', '').strip()
+    
+    # Unsearched pages come straight from the static snapshot when enabled
+    if current_app.config.get('SERVE_STATIC_SNAPSHOT') and not search_query:
+        response = snapshot_response(gallery_filename(category_filter))
+        if response is not None:
+            return response
+    
+    return render_gallery(search_query, category_filter)
+
 @public_bp.route('/about')
 def about():
     """About page with store info"""
+    if current_app.config.get('SERVE_STATIC_SNAPSHOT'):
+        response = snapshot_response('about.html')
+        if response is not None:
+            return response
+    
     return render_template('public/about.html')
 
+@public_bp.route('/suggest')
+def suggest():
+    """Search-as-you-type suggestions from the in-memory prefix index"""
+    prefix = request.args.get('q', '').strip()
+    
+    try:
+        limit = max(1, min(int(request.args.get('limit', 8)), 20))
+    except ValueError:
+        limit = 8
+    
+    prefix_index.refresh()
+    return jsonify({
+        'query': prefix,
+        'suggestions': prefix_index.suggest(prefix, limit=limit)
+    })
+
+@public_bp.route('/catalog.json')
+def catalog_json():
+    """Public catalog as JSON"""
+    if current_app.config.get('SERVE_STATIC_SNAPSHOT'):
+        response = snapshot_response('catalog.json')
+        if response is not None:
+            return response
+    
+    return jsonify(build_catalog())
+
 
 @public_bp.route('/uploads/<path:filename>')
 def serve_uploaded_file(filename):
@@ -0,0 +1,149 @@
+import re
+import threading
+from bisect import bisect_left, insort
+from sqlalchemy import func
+from app import db
+from models import Product, StockMovement
+from catalog import current_catalog_version
+
+# Fields offered as suggestions, in display order for ties
+SUGGEST_FIELDS = ('name', 'brand', 'color', 'category')
+
+_SEPARATOR = '\x00'
+
+def normalize(text):
+    """Lowercase and collapse anything that is not a letter or digit"""
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', (text or '').lower()).split())
+
+def _tokens(value):
+    """Index keys for a value: the whole value plus each later word in it"""
+    normalized = normalize(value)
+    if not normalized:
+        return []
+    words = normalized.split(' ')
+    return [normalized] + [' '.join(words[i:]) for i in range(1, len(words))]
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index over public product terms.
+    Keys are "token\\0kind\\0display" strings in one sorted list, so a lookup
+    is a bisect plus a short forward scan.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._counts = {}           # (kind, display) -> number of in-stock products
+        self._product_terms = {}    # product_id -> tuple of (kind, display)
+        self._lock = threading.Lock()
+        self.version = None
+        self.last_movement_id = 0
+
+    def _product_entries(self, product):
+        entries = []
+        for kind in SUGGEST_FIELDS:
+            display = (getattr(product, kind) or '').strip()
+            if display:
+                entries.append((kind, display))
+        return tuple(entries)
+
+    def _add_entry(self, entry):
+        count = self._counts.get(entry, 0)
+        self._counts[entry] = count + 1
+        if count == 0:
+            kind, display = entry
+            for token in _tokens(display):
+                insort(self._keys, _SEPARATOR.join((token, kind, display)))
+
+    def _remove_entry(self, entry):
+        count = self._counts.get(entry, 0) - 1
+        if count > 0:
+            self._counts[entry] = count
+            return
+        self._counts.pop(entry, None)
+        kind, display = entry
+        for token in _tokens(display):
+            key = _SEPARATOR.join((token, kind, display))
+            position = bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+
+    def _set_product(self, product_id, product):
+        """Replace the terms contributed by one product (None removes it)"""
+        for entry in self._product_terms.pop(product_id, ()):
+            self._remove_entry(entry)
+
+        if product is not None and product.quantity > 0:
+            entries = self._product_entries(product)
+            self._product_terms[product_id] = entries
+            for entry in entries:
+                self._add_entry(entry)
+
+    def rebuild(self, version):
+        """Full build from the products table"""
+        last_movement_id = db.session.query(func.max(StockMovement.id)).scalar() or 0
+        products = Product.query.filter(Product.quantity > 0).all()
+
+        self._keys = []
+        self._counts = {}
+        self._product_terms = {}
+        for product in products:
+            self._set_product(product.id, product)
+
+        self.version = version
+        self.last_movement_id = last_movement_id
+
+    def apply_changes(self, version):
+        """Re-read only the products with stock movements since the last refresh"""
+        rows = db.session.query(StockMovement.id, StockMovement.product_id).filter(
+            StockMovement.id > self.last_movement_id
+        ).all()
+
+        if rows:
+            changed_ids = {row.product_id for row in rows}
+            products = {p.id: p for p in Product.query.filter(Product.id.in_(changed_ids)).all()}
+            for product_id in changed_ids:
+                self._set_product(product_id, products.get(product_id))
+            self.last_movement_id = max(row.id for row in rows)
+
+        self.version = version
+
+    def refresh(self):
+        """Bring the index up to date with the catalog version"""
+        version = current_catalog_version()
+        if version == self.version:
+            return
+
+        with self._lock:
+            if version == self.version:
+                return
+            if self.version is None:
+                self.rebuild(version)
+            else:
+                self.apply_changes(version)
+
+    def suggest(self, prefix, limit=8):
+        """Top suggestions whose value (or a word in it) starts with prefix"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        matches = {}
+        with self._lock:
+            keys = self._keys
+            position = bisect_left(keys, prefix)
+            while position < len(keys) and keys[position].startswith(prefix):
+                _, kind, display = keys[position].split(_SEPARATOR)
+                matches[(kind, display)] = self._counts.get((kind, display), 0)
+                position += 1
+
+        ranked = sorted(
+            matches.items(),
+            key=lambda item: (-item[1], SUGGEST_FIELDS.index(item[0][0]), item[0][1].lower())
+        )
+        return [
+            {'text': display, 'kind': kind, 'count': count}
+            for (kind, display), count in ranked[:limit]
+        ]
+
+# One index per worker process
+prefix_index = PrefixIndex()
@@ -0,0 +1,174 @@
+import os
+import json
+import fcntl
+import shutil
+import uuid
+import mimetypes
+from datetime import datetime
+from flask import current_app, url_for, send_file
+from utils import slugify
+from compression import available_encodings, compress_bytes, negotiate_encoding, ENCODING_SUFFIXES
+
+def snapshot_root():
+    """Directory holding published snapshots"""
+    return os.path.join(current_app.instance_path, 'snapshot')
+
+def gallery_filename(category=''):
+    """Snapshot file for the gallery, optionally filtered by category"""
+    if category:
+        return os.path.join('category', f'{slugify(category)}.html')
+    return 'index.html'
+
+def read_manifest():
+    """Manifest of the live snapshot, or None if nothing has been published"""
+    manifest_path = os.path.join(snapshot_root(), 'current', 'manifest.json')
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def assets_hash():
+    """Fingerprint of the static asset URLs the snapshot pages link to"""
+    return current_app.extensions.get('assets', {}).get('hash')
+
+def snapshot_is_current(manifest, version):
+    """True if the manifest is for this or a newer catalog, rendered against current assets"""
+    if not manifest:
+        return False
+    published = manifest.get('version', 0)
+    return published > version or (published == version and manifest.get('assets') == assets_hash())
+
+def snapshot_response(filename):
+    """Serve a file from the live snapshot; None if it is missing"""
+    path = os.path.join(snapshot_root(), 'current', filename)
+    if not os.path.isfile(path):
+        return None
+
+    encoding = negotiate_encoding()
+    compressed_path = path + ENCODING_SUFFIXES[encoding] if encoding else None
+    if compressed_path and os.path.isfile(compressed_path):
+        mimetype = mimetypes.guess_type(filename)[0]
+        response = send_file(compressed_path, mimetype=mimetype, max_age=0)
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_file(path, max_age=0)
+    response.vary.add('Accept-Encoding')
+    return response
+
+def build_catalog():
+    """JSON-serialisable public catalog (no prices, like the gallery)"""
+    from routes.public import public_products
+
+    products = []
+    for product in public_products():
+        image_url = None
+        if product.image_path_web:
+            image_url = url_for('public.serve_uploaded_file', filename=product.image_path_web)
+        products.append({
+            'id': product.id,
+            'name': product.name,
+            'category': product.category,
+            'brand': product.brand,
+            'color': product.color,
+            'size': product.size,
+            'image': image_url
+        })
+    return {'products': products}
+
+def _write(build_dir, filename, content):
+    """Write a snapshot file plus precompressed copies of it"""
+    path = os.path.join(build_dir, filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = content.encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
+    for encoding in available_encodings():
+        with open(path + ENCODING_SUFFIXES[encoding], 'wb') as f:
+            f.write(compress_bytes(data, encoding, level=9))
+
+def publish_snapshot(version):
+    """
+    Render the public pages and catalog JSON for a catalog version and swap
+    them in atomically. Readers see either the old snapshot or the new one.
+    """
+    from routes.public import render_gallery, public_categories
+    from flask import render_template
+
+    root = snapshot_root()
+    os.makedirs(root, exist_ok=True)
+
+    if snapshot_is_current(read_manifest(), version):
+        # This or a newer catalog has already been published by another worker
+        return False
+
+    build_dir = os.path.join(root, f'.build-{uuid.uuid4().hex}')
+    os.makedirs(build_dir)
+
+    try:
+        with current_app.test_request_context('/'):
+            categories = public_categories()
+            files = {'index.html': render_gallery()}
+            for category in categories:
+                files[gallery_filename(category)] = render_gallery(category_filter=category)
+            files['about.html'] = render_template('public/about.html')
+            catalog = build_catalog()
+
+        for filename, content in files.items():
+            _write(build_dir, filename, content)
+        _write(build_dir, 'catalog.json', json.dumps(catalog))
+
+        manifest = {
+            'version': version,
+            'assets': assets_hash(),
+            'published_at': datetime.utcnow().isoformat(),
+            'categories': categories,
+            'pages': sorted(files),
+            'images': sorted({p['image'] for p in catalog['products'] if p['image']})
+        }
+        _write(build_dir, 'manifest.json', json.dumps(manifest, indent=2))
+
+        # Swap and prune under an exclusive lock so workers publishing at the
+        # same time cannot roll 'current' back or delete each other's output
+        with open(os.path.join(root, '.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            if snapshot_is_current(read_manifest(), version):
+                shutil.rmtree(build_dir, ignore_errors=True)
+                return False
+
+            version_dir = f'v{version}-{uuid.uuid4().hex[:8]}'
+            os.rename(build_dir, os.path.join(root, version_dir))
+
+            link_tmp = os.path.join(root, f'.current-{uuid.uuid4().hex}')
+            os.symlink(version_dir, link_tmp)
+            os.replace(link_tmp, os.path.join(root, 'current'))
+
+            _prune_old_snapshots(root)
+    except Exception:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+
+    return True
+
+def _prune_old_snapshots(root):
+    """Remove superseded snapshot directories, keeping the live one and its predecessor"""
+    live = os.readlink(os.path.join(root, 'current'))
+    versions = []
+    for name in os.listdir(root):
+        if name.startswith('v') and name != live:
+            path = os.path.join(root, name)
+            versions.append((os.path.getmtime(path), path))
+
+    for _, path in sorted(versions)[:-1]:
+        shutil.rmtree(path, ignore_errors=True)
+
+def publish_if_enabled(version):
+    """Publish after a committed catalog change; failures never break the caller"""
+    if not current_app.config.get('STATIC_SNAPSHOT_ENABLED'):
+        return
+
+    try:
+        publish_snapshot(version)
+    except Exception as e:
+        current_app.logger.error("Error publishing static snapshot: %s", e)
@@ -127,6 +127,43 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // Search-as-you-type suggestions
+    const suggestInputs = document.querySelectorAll('input[data-suggest-url]');
+    suggestInputs.forEach(function(input) {
+        const datalist = document.getElementById(input.getAttribute('list'));
+        if (!datalist) {
+            return;
+        }
+
+        let lastPrefix = '';
+        const fetchSuggestions = debounce(function() {
+            const prefix = input.value.trim();
+            if (!prefix || prefix === lastPrefix) {
+                return;
+            }
+            lastPrefix = prefix;
+
+            const url = input.dataset.suggestUrl + '?q=' + encodeURIComponent(prefix);
+            fetch(url)
+                .then(function(response) { return response.json(); })
+                .then(function(data) {
+                    if (data.query !== input.value.trim()) {
+                        return;  // a newer keystroke has already moved on
+                    }
+                    datalist.innerHTML = '';
+                    data.suggestions.forEach(function(suggestion) {
+                        const option = document.createElement('option');
+                        option.value = suggestion.text;
+                        option.label = suggestion.kind;
+                        datalist.appendChild(option);
+                    });
+                })
+                .catch(function() {});
+        }, 120);
+
+        input.addEventListener('input', fetchSuggestions);
+    });
+
     // Price input formatting
     const priceInputs = document.querySelectorAll('input[type="number"][step="0.01"]');
     priceInputs.forEach(function(input) {
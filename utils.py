@@ -51,7 +51,7 @@ def process_image(image_file):
             img.save(web_full_path, 'JPEG', quality=85, optimize=True)
             
     except Exception as e:
-        current_app.logger.error(f"Error processing image: {e}")
+        current_app.logger.error("Error processing image: %s", e)
         # If processing fails, copy original to web
         import shutil
         shutil.copy2(original_full_path, web_full_path)